@@ -34,6 +34,7 @@ import re
 
 #custom patch libraries
 import patch
+from shards import DEFAULT_MAX_SHARD_BYTES, ShardWriter
 
 
 LOGGER_NAME = "google_image_scraper"
@@ -55,6 +56,7 @@ class GoogleImageScraper:
     PREVIEW_IMAGE_SELECTORS = ("img.n3VNCb", "img.sFlh5c")
     OVERLAY_SELECTORS = (".sfbg", "#searchform")
     VALID_PROTOCOLS = ("http://", "https://")
+    OUTPUT_FORMATS = ("files", "shards")
 
     def __init__(
         self,
@@ -66,14 +68,21 @@ class GoogleImageScraper:
         min_resolution: Sequence[int] = (0, 0),
         max_resolution: Sequence[int] = (1920, 1080),
         max_missed: int = 10,
+        output_format: str = "files",
+        max_shard_bytes: int = DEFAULT_MAX_SHARD_BYTES,
     ) -> None:
         self._validate_number_of_images(number_of_images)
+        self._validate_output_format(output_format)
+        self._validate_max_shard_bytes(max_shard_bytes)
         self.search_key = search_key
         self.number_of_images = number_of_images
         self.headless = headless
         self.min_resolution = tuple(min_resolution)
         self.max_resolution = tuple(max_resolution)
         self.max_missed = max_missed
+        self.output_format = output_format
+        self.max_shard_bytes = max_shard_bytes
+        self.shard_writer: Optional[ShardWriter] = None
         self.webdriver_path = webdriver_path
         self.image_path = self._prepare_image_directory(image_path, search_key)
         self.driver = self._create_webdriver(webdriver_path, headless)
@@ -145,11 +154,18 @@ class GoogleImageScraper:
             return
 
         logger.info("Saving image, please wait...")
-        for index, image_url in enumerate(image_urls):
-            try:
-                self._download_image(image_url, index, keep_filenames)
-            except Exception as error:  # pylint: disable=broad-except
-                logger.error("Download failed: %s", error)
+        if self.output_format == "shards":
+            self.shard_writer = ShardWriter(self.image_path, self.max_shard_bytes)
+        try:
+            for index, image_url in enumerate(image_urls):
+                try:
+                    self._download_image(image_url, index, keep_filenames)
+                except Exception as error:  # pylint: disable=broad-except
+                    logger.error("Download failed: %s", error)
+        finally:
+            if self.shard_writer is not None:
+                self.shard_writer.close()
+                self.shard_writer = None
 
         logger.info("Downloads completed. Some photos may be skipped if the format is unsupported or the resolution is out of range.")
 
@@ -280,6 +296,16 @@ class GoogleImageScraper:
         if not isinstance(number_of_images, int) or number_of_images < 1:
             raise ValueError("number_of_images must be a positive integer")
 
+    @staticmethod
+    def _validate_max_shard_bytes(max_shard_bytes: int) -> None:
+        if not isinstance(max_shard_bytes, int) or max_shard_bytes < 1:
+            raise ValueError("max_shard_bytes must be a positive integer")
+
+    @classmethod
+    def _validate_output_format(cls, output_format: str) -> None:
+        if output_format not in cls.OUTPUT_FORMATS:
+            raise ValueError(f"output_format must be one of {', '.join(cls.OUTPUT_FORMATS)}")
+
     @staticmethod
     def _prepare_image_directory(root_path: str, search_key: str) -> str:
         directory = os.path.join(root_path, search_key)
@@ -308,6 +334,10 @@ class GoogleImageScraper:
         search_prefix = "".join(char for char in self.search_key if char.isalnum())
         with Image.open(io.BytesIO(response.content)) as image_from_web:
             filename = self._compute_filename(image_url, index, search_prefix, image_from_web.format, keep_filenames)
+            if self.shard_writer is not None:
+                self._append_to_shard(image_from_web, filename, response.content, index)
+                return
+
             destination = os.path.join(self.image_path, filename)
             self._save_image_asset(image_from_web, destination)
 
@@ -335,6 +365,20 @@ class GoogleImageScraper:
             return f"{base_name}.{extension}"
         return f"{search_prefix}{index}.{extension}"
 
+    def _append_to_shard(self, image_from_web: Image.Image, key: str, payload: bytes, index: int) -> None:
+        # Shards store the downloaded bytes as-is, so filter before writing anything.
+        if not self._is_within_resolution(image_from_web.size):
+            logger.debug("Skipping %s due to resolution %s", key, image_from_web.size)
+            return
+        entry = self.shard_writer.add(key, payload)
+        logger.info(
+            "%s \t %s \t Image saved to shard %s at offset %d",
+            self.search_key,
+            index,
+            entry.shard,
+            entry.offset,
+        )
+
     def _save_image_asset(self, image_from_web: Image.Image, destination: str) -> None:
         try:
             image_from_web.save(destination)
@@ -355,6 +399,13 @@ class GoogleImageScraper:
         return True
 
 
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
 def parse_cli_arguments(args: Optional[Sequence[str]] = None) -> argparse.Namespace:
     """Parse command-line arguments for the standalone scraper entry point."""
 
@@ -406,6 +457,19 @@ def parse_cli_arguments(args: Optional[Sequence[str]] = None) -> argparse.Namesp
         default=10,
         help="Maximum number of consecutive misses before stopping (default: 10)",
     )
+    parser.add_argument(
+        "--output-format",
+        choices=GoogleImageScraper.OUTPUT_FORMATS,
+        default="files",
+        help="Write one file per image or pack images into tar shards (default: files)",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=_positive_int,
+        default=DEFAULT_MAX_SHARD_BYTES // (1024 * 1024),
+        metavar="MB",
+        help="Maximum size of each shard in megabytes when using --output-format shards (default: 256)",
+    )
     parser.add_argument(
         "--keep-filenames",
         action="store_true",
@@ -454,6 +518,8 @@ def run_cli(cli_args: Optional[Sequence[str]] = None) -> None:
         min_resolution=tuple(args.min_resolution),
         max_resolution=tuple(args.max_resolution),
         max_missed=args.max_missed,
+        output_format=args.output_format,
+        max_shard_bytes=args.shard_size * 1024 * 1024,
     )
 
     image_urls = scraper.find_image_urls()
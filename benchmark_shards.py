@@ -0,0 +1,122 @@
+"""Compare the per-file output layout against packed shards.
+
+Writes the same synthetic payloads both ways into a temporary directory and
+reports write time, random-read time and the number of files created.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+import zlib
+from typing import List, Optional, Sequence
+
+from shards import ShardReader, ShardWriter
+
+
+def generate_payloads(count: int, size: int, seed: int) -> List[bytes]:
+    rng = random.Random(seed)
+    return [rng.randbytes(size) for _ in range(count)]
+
+
+def bench_files(directory: str, keys: Sequence[str], payloads: Sequence[bytes], order: Sequence[int]) -> dict:
+    os.makedirs(directory, exist_ok=True)
+    start = time.perf_counter()
+    for key, payload in zip(keys, payloads):
+        with open(os.path.join(directory, key), "wb") as image_file:
+            image_file.write(payload)
+    write_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    total = 0
+    checksum = 0
+    for position in order:
+        with open(os.path.join(directory, keys[position]), "rb") as image_file:
+            payload = image_file.read()
+            checksum = zlib.crc32(payload, checksum)
+            total += len(payload)
+    read_seconds = time.perf_counter() - start
+    return {
+        "write": write_seconds,
+        "read": read_seconds,
+        "bytes": total,
+        "checksum": checksum,
+        "files": len(os.listdir(directory)),
+    }
+
+
+def bench_shards(
+    directory: str,
+    keys: Sequence[str],
+    payloads: Sequence[bytes],
+    order: Sequence[int],
+    max_shard_bytes: int,
+) -> dict:
+    start = time.perf_counter()
+    with ShardWriter(directory, max_shard_bytes) as writer:
+        for key, payload in zip(keys, payloads):
+            writer.add(key, payload)
+    write_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    total = 0
+    checksum = 0
+    with ShardReader(directory) as reader:
+        for position in order:
+            with reader.read(keys[position]) as view:
+                checksum = zlib.crc32(view, checksum)
+                total += len(view)
+    read_seconds = time.perf_counter() - start
+    return {
+        "write": write_seconds,
+        "read": read_seconds,
+        "bytes": total,
+        "checksum": checksum,
+        "files": len(os.listdir(directory)),
+    }
+
+
+def parse_cli_arguments(args: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark per-file output against packed shards.")
+    parser.add_argument("--count", type=int, default=5000, help="Number of synthetic images (default: 5000)")
+    parser.add_argument("--size", type=int, default=64 * 1024, help="Bytes per image (default: 65536)")
+    parser.add_argument("--shard-size", type=int, default=64, metavar="MB", help="Shard size in megabytes (default: 64)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--workdir", default=None, help="Directory for temporary output (default: system temp)")
+    return parser.parse_args(args)
+
+
+def main(cli_args: Optional[Sequence[str]] = None) -> None:
+    args = parse_cli_arguments(cli_args)
+    payloads = generate_payloads(args.count, args.size, args.seed)
+    keys = [f"image{index}.jpg" for index in range(args.count)]
+    order = list(range(args.count))
+    random.Random(args.seed).shuffle(order)
+
+    workdir = tempfile.mkdtemp(prefix="shard_bench_", dir=args.workdir)
+    try:
+        results = {
+            "files": bench_files(os.path.join(workdir, "files"), keys, payloads, order),
+            "shards": bench_shards(
+                os.path.join(workdir, "shards"), keys, payloads, order, args.shard_size * 1024 * 1024
+            ),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if results["files"]["checksum"] != results["shards"]["checksum"]:
+        raise RuntimeError("Per-file and shard layouts read back different data")
+
+    print(f"{args.count} images x {args.size} bytes")
+    print(f"{'layout':<8} {'write s':>9} {'read s':>9} {'read bytes':>12} {'files':>7}")
+    for layout, result in results.items():
+        print(
+            f"{layout:<8} {result['write']:>9.3f} {result['read']:>9.3f} "
+            f"{result['bytes']:>12} {result['files']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
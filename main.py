@@ -8,6 +8,7 @@ from typing import Iterable, List
 
 from GoogleImageScraper import GoogleImageScraper
 from patch import webdriver_executable
+from shards import DEFAULT_MAX_SHARD_BYTES
 
 
 logger = logging.getLogger(__name__)
@@ -23,6 +24,8 @@ class ScraperSettings:
     max_resolution: tuple[int, int]
     max_missed: int
     keep_filenames: bool
+    output_format: str = "files"
+    max_shard_bytes: int = DEFAULT_MAX_SHARD_BYTES
 
 
 def configure_logging() -> None:
@@ -43,6 +46,8 @@ def run_search(search_key: str, settings: ScraperSettings) -> None:
             min_resolution=settings.min_resolution,
             max_resolution=settings.max_resolution,
             max_missed=settings.max_missed,
+            output_format=settings.output_format,
+            max_shard_bytes=settings.max_shard_bytes,
         )
         image_urls = scraper.find_image_urls()
         scraper.save_images(image_urls, keep_filenames=settings.keep_filenames)
@@ -71,6 +76,8 @@ def build_default_settings() -> ScraperSettings:
         max_resolution=(9999, 9999),
         max_missed=10,
         keep_filenames=False,
+        output_format="files",
+        max_shard_bytes=DEFAULT_MAX_SHARD_BYTES,
     )
 
 
@@ -0,0 +1,344 @@
+"""Packed, size-bounded shard storage for downloaded images.
+
+Images are appended to plain tar archives (``shard-000000.tar``, ...) that any
+tar/WebDataset tooling can read. A sidecar ``shards.idx`` file records the shard
+number, data offset and length of every member so that :class:`ShardReader`
+can memory-map the index and hand out zero-copy views into the shards.
+
+Index layout (little-endian)::
+
+    header   : magic (8s) | entry count (Q)
+    records  : shard (I) | offset (Q) | length (Q) | key offset (Q) | key length (I)
+    key blob : UTF-8 keys referenced by the records
+
+Records are sorted by key so lookups can binary-search the mapped index
+without building an in-memory table. The index is only written when a writer
+closes, merged with whatever is on disk at that point; entries for shards the
+index does not cover (e.g. after a crash) are rebuilt from their tar headers.
+"""
+
+import mmap
+import os
+import re
+import struct
+import tarfile
+import time
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import BinaryIO, Collection, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+
+INDEX_FILENAME = "shards.idx"
+INDEX_MAGIC = b"GISIDX01"
+SHARD_TEMPLATE = "shard-{:06d}.tar"
+SHARD_PATTERN = re.compile(r"^shard-(\d{6})\.tar$")
+DEFAULT_MAX_SHARD_BYTES = 256 * 1024 * 1024
+
+_HEADER = struct.Struct("<8sQ")
+_RECORD = struct.Struct("<IQQQI")
+_BLOCK_SIZE = tarfile.BLOCKSIZE
+_END_OF_ARCHIVE = 2 * _BLOCK_SIZE
+
+
+@dataclass(frozen=True)
+class ShardEntry:
+    key: str
+    shard: int
+    offset: int
+    length: int
+
+
+def shard_filename(shard: int) -> str:
+    return SHARD_TEMPLATE.format(shard)
+
+
+def _padding(length: int) -> int:
+    return -length % _BLOCK_SIZE
+
+
+def _write_index(directory: str, entries: List[ShardEntry]) -> None:
+    ordered = sorted(entries, key=lambda entry: entry.key)
+    encoded_keys = [entry.key.encode("utf-8") for entry in ordered]
+
+    records = bytearray()
+    key_offset = 0
+    for entry, encoded in zip(ordered, encoded_keys):
+        records += _RECORD.pack(entry.shard, entry.offset, entry.length, key_offset, len(encoded))
+        key_offset += len(encoded)
+
+    index_path = os.path.join(directory, INDEX_FILENAME)
+    temp_path = f"{index_path}.tmp"
+    with open(temp_path, "wb") as index_file:
+        index_file.write(_HEADER.pack(INDEX_MAGIC, len(ordered)))
+        index_file.write(records)
+        index_file.write(b"".join(encoded_keys))
+    os.replace(temp_path, index_path)
+
+
+def _read_index(directory: str) -> List[ShardEntry]:
+    with ShardReader(directory) as reader:
+        return [reader.entry(position) for position in range(len(reader))]
+
+
+def _scan_shard(directory: str, shard: int) -> List[ShardEntry]:
+    """Recover entries from a shard's tar headers, stopping at any truncation."""
+
+    path = os.path.join(directory, shard_filename(shard))
+    shard_size = os.path.getsize(path)
+    entries: List[ShardEntry] = []
+    with suppress(tarfile.TarError, EOFError, OSError):
+        with tarfile.open(path, mode="r:") as archive:
+            for member in archive:
+                if not member.isfile() or member.offset_data + member.size > shard_size:
+                    break
+                entries.append(ShardEntry(member.name, shard, member.offset_data, member.size))
+    return entries
+
+
+def _merge_entry(entries: Dict[str, ShardEntry], entry: ShardEntry) -> None:
+    # Shard numbers only grow, so the entry from the newest shard wins.
+    current = entries.get(entry.key)
+    if current is None or current.shard <= entry.shard:
+        entries[entry.key] = entry
+
+
+class ShardWriter:
+    """Append image payloads to size-bounded tar shards with a sidecar index."""
+
+    def __init__(self, directory: str, max_shard_bytes: int = DEFAULT_MAX_SHARD_BYTES) -> None:
+        if not isinstance(max_shard_bytes, int) or max_shard_bytes < 1:
+            raise ValueError("max_shard_bytes must be a positive integer")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_shard_bytes = max_shard_bytes
+        self._added: Dict[str, ShardEntry] = {}
+        self._written_shards: Set[int] = set()
+        self._next_shard = max(self._existing_shards(), default=-1) + 1
+        self._shard_file: Optional[BinaryIO] = None
+        self._closed = False
+        self._shard_number = -1
+        self._shard_bytes = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def add(self, key: str, payload: bytes) -> ShardEntry:
+        """Append ``payload`` under ``key``; a repeated key replaces the earlier entry."""
+
+        if self._closed:
+            raise ValueError("Cannot add to a closed ShardWriter")
+
+        info = tarfile.TarInfo(name=key)
+        info.size = len(payload)
+        info.mtime = int(time.time())
+        info.mode = 0o644
+        header = info.tobuf(format=tarfile.PAX_FORMAT, encoding="utf-8")
+        member_bytes = len(header) + len(payload) + _padding(len(payload))
+
+        # The limit covers the end-of-archive marker written by _close_shard.
+        if self._shard_file is None or (
+            self._shard_bytes > 0
+            and self._shard_bytes + member_bytes + _END_OF_ARCHIVE > self.max_shard_bytes
+        ):
+            self._open_next_shard()
+
+        offset = self._shard_bytes + len(header)
+        self._shard_file.write(header)
+        self._shard_file.write(payload)
+        self._shard_file.write(b"\0" * _padding(len(payload)))
+        self._shard_bytes += member_bytes
+
+        entry = ShardEntry(key=key, shard=self._shard_number, offset=offset, length=len(payload))
+        self._added[key] = entry
+        return entry
+
+    def close(self) -> None:
+        """Finish the open shard and merge this writer's entries into the index."""
+
+        if self._closed:
+            return
+        self._close_shard()
+        entries = self._load_entries(skip_shards=self._written_shards)
+        for entry in self._added.values():
+            _merge_entry(entries, entry)
+        _write_index(self.directory, list(entries.values()))
+        self._closed = True
+
+    def __enter__(self) -> "ShardWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Shard helpers
+    # ------------------------------------------------------------------
+    def _existing_shards(self) -> List[int]:
+        shards = []
+        for filename in os.listdir(self.directory):
+            match = SHARD_PATTERN.match(filename)
+            if match:
+                shards.append(int(match.group(1)))
+        return sorted(shards)
+
+    def _load_entries(self, skip_shards: Collection[int] = ()) -> Dict[str, ShardEntry]:
+        # A corrupt index is treated as empty, so every shard gets rescanned.
+        entries: Dict[str, ShardEntry] = {}
+        if os.path.isfile(os.path.join(self.directory, INDEX_FILENAME)):
+            with suppress(ValueError):
+                entries = {entry.key: entry for entry in _read_index(self.directory)}
+
+        indexed = {entry.shard for entry in entries.values()}
+        for shard in self._existing_shards():
+            if shard in indexed or shard in skip_shards:
+                continue
+            for entry in _scan_shard(self.directory, shard):
+                _merge_entry(entries, entry)
+        return entries
+
+    def _open_next_shard(self) -> None:
+        self._close_shard()
+        # Exclusive creation keeps concurrent writers from truncating each other's shards.
+        while True:
+            self._shard_number = self._next_shard
+            self._next_shard += 1
+            path = os.path.join(self.directory, shard_filename(self._shard_number))
+            try:
+                self._shard_file = open(path, "xb")
+                break
+            except FileExistsError:
+                continue
+        self._shard_bytes = 0
+        self._written_shards.add(self._shard_number)
+
+    def _close_shard(self) -> None:
+        if self._shard_file is None:
+            return
+        # Two zero blocks mark the end of a tar archive.
+        self._shard_file.write(b"\0" * _END_OF_ARCHIVE)
+        self._shard_file.close()
+        self._shard_file = None
+
+
+class ShardReader:
+    """Random access into shards written by :class:`ShardWriter`.
+
+    The index and shards are memory-mapped. :meth:`read` returns zero-copy
+    ``memoryview`` slices of the mapping, while iteration yields ``bytes`` copies.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._shards: Dict[int, Tuple[BinaryIO, mmap.mmap]] = {}
+        with open(os.path.join(directory, INDEX_FILENAME), "rb") as index_file:
+            self._index = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._count, self._keys_start = self._validate_index()
+        except ValueError:
+            self._index.close()
+            raise ValueError(f"{directory} does not contain a valid shard index") from None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Tuple[str, bytes]]:
+        for position in range(self._count):
+            entry = self.entry(position)
+            with self._view(entry) as view:
+                yield entry.key, bytes(view)
+
+    def __contains__(self, key: str) -> bool:
+        return self._find(key) is not None
+
+    def keys(self) -> List[str]:
+        return [self._key_at(position) for position in range(self._count)]
+
+    def entry(self, position: int) -> ShardEntry:
+        """Return the index entry at ``position`` (entries are sorted by key)."""
+
+        if not 0 <= position < self._count:
+            raise IndexError(position)
+        shard, offset, length, _, _ = self._record(position)
+        return ShardEntry(key=self._key_at(position), shard=shard, offset=offset, length=length)
+
+    def read(self, key_or_position: Union[str, int]) -> memoryview:
+        """Return a zero-copy view of the payload stored under a key or index position."""
+
+        if isinstance(key_or_position, str):
+            position = self._find(key_or_position)
+            if position is None:
+                raise KeyError(key_or_position)
+        else:
+            position = key_or_position
+        return self._view(self.entry(position))
+
+    def close(self) -> None:
+        # A mapping with views still exported cannot be closed yet; it is
+        # released once the caller drops those views.
+        for shard_file, shard_map in self._shards.values():
+            with suppress(BufferError):
+                shard_map.close()
+            shard_file.close()
+        self._shards.clear()
+        with suppress(BufferError):
+            self._index.close()
+
+    def __enter__(self) -> "ShardReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Index helpers
+    # ------------------------------------------------------------------
+    def _validate_index(self) -> Tuple[int, int]:
+        if len(self._index) < _HEADER.size:
+            raise ValueError("index header is truncated")
+        magic, count = _HEADER.unpack_from(self._index, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError("index magic does not match")
+        keys_start = _HEADER.size + count * _RECORD.size
+        if len(self._index) < keys_start:
+            raise ValueError("index records are truncated")
+        return count, keys_start
+
+    def _record(self, position: int) -> Tuple[int, int, int, int, int]:
+        return _RECORD.unpack_from(self._index, _HEADER.size + position * _RECORD.size)
+
+    def _key_bytes(self, position: int) -> bytes:
+        _, _, _, key_offset, key_length = self._record(position)
+        start = self._keys_start + key_offset
+        return self._index[start:start + key_length]
+
+    def _key_at(self, position: int) -> str:
+        return self._key_bytes(position).decode("utf-8")
+
+    def _find(self, key: str) -> Optional[int]:
+        # Keys are sorted as str; UTF-8 byte order matches code point order.
+        target = key.encode("utf-8")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_bytes(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._key_bytes(low) == target:
+            return low
+        return None
+
+    def _view(self, entry: ShardEntry) -> memoryview:
+        shard_map = self._shard_map(entry.shard)
+        return memoryview(shard_map)[entry.offset:entry.offset + entry.length]
+
+    def _shard_map(self, shard: int) -> mmap.mmap:
+        if shard not in self._shards:
+            path = os.path.join(self.directory, shard_filename(shard))
+            shard_file = open(path, "rb")
+            self._shards[shard] = (shard_file, mmap.mmap(shard_file.fileno(), 0, access=mmap.ACCESS_READ))
+        return self._shards[shard][1]
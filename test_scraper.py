@@ -0,0 +1,107 @@
+import io
+from dataclasses import replace
+
+import pytest
+from PIL import Image
+
+import GoogleImageScraper as scraper_module
+import main
+from GoogleImageScraper import GoogleImageScraper, parse_cli_arguments, run_cli
+from shards import DEFAULT_MAX_SHARD_BYTES, ShardReader
+
+
+class RecordingScraper(GoogleImageScraper):
+    """Captures constructor arguments instead of starting Chrome."""
+
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        RecordingScraper.instances.append(self)
+
+    def find_image_urls(self):
+        return []
+
+    def save_images(self, image_urls, keep_filenames):
+        pass
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+def encode_png(size):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def recording_scraper(monkeypatch):
+    RecordingScraper.instances = []
+    monkeypatch.setattr(scraper_module, "GoogleImageScraper", RecordingScraper)
+    monkeypatch.setattr(main, "GoogleImageScraper", RecordingScraper)
+    return RecordingScraper
+
+
+def test_parse_cli_output_format_defaults():
+    args = parse_cli_arguments(["--search", "cats"])
+    assert args.output_format == "files"
+    assert args.shard_size * 1024 * 1024 == DEFAULT_MAX_SHARD_BYTES
+
+
+@pytest.mark.parametrize("argv", [["--shard-size", "0"], ["--output-format", "zip"]])
+def test_parse_cli_rejects_invalid_shard_options(argv):
+    with pytest.raises(SystemExit):
+        parse_cli_arguments(["--search", "cats", *argv])
+
+
+def test_run_cli_converts_shard_size_to_bytes(recording_scraper):
+    run_cli(["--search", "cats", "--output-format", "shards", "--shard-size", "8"])
+
+    kwargs = recording_scraper.instances[0].kwargs
+    assert kwargs["output_format"] == "shards"
+    assert kwargs["max_shard_bytes"] == 8 * 1024 * 1024
+
+
+def test_run_search_passes_shard_settings(recording_scraper):
+    settings = replace(main.build_default_settings(), output_format="shards", max_shard_bytes=4096)
+    main.run_search("cats", settings)
+
+    kwargs = recording_scraper.instances[0].kwargs
+    assert kwargs["output_format"] == "shards"
+    assert kwargs["max_shard_bytes"] == 4096
+
+
+def test_constructor_rejects_invalid_max_shard_bytes():
+    with pytest.raises(ValueError):
+        GoogleImageScraper._validate_max_shard_bytes(0)
+
+
+def test_save_images_writes_raw_bytes_to_shards(tmp_path, monkeypatch):
+    payloads = {
+        "https://example.com/large.png": encode_png((64, 64)),
+        "https://example.com/small.png": encode_png((8, 8)),
+    }
+    monkeypatch.setattr(scraper_module.requests, "get", lambda url, timeout: FakeResponse(payloads[url]))
+
+    scraper = GoogleImageScraper.__new__(GoogleImageScraper)
+    scraper.search_key = "cats"
+    scraper.image_path = str(tmp_path)
+    scraper.min_resolution = (16, 16)
+    scraper.max_resolution = (128, 128)
+    scraper.output_format = "shards"
+    scraper.max_shard_bytes = DEFAULT_MAX_SHARD_BYTES
+    scraper.shard_writer = None
+
+    scraper.save_images(list(payloads), keep_filenames=False)
+
+    assert scraper.shard_writer is None
+    with ShardReader(str(tmp_path)) as reader:
+        assert reader.keys() == ["cats0.png"]
+        with reader.read("cats0.png") as view:
+            assert bytes(view) == payloads["https://example.com/large.png"]
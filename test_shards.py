@@ -0,0 +1,159 @@
+import os
+import struct
+import tarfile
+
+import pytest
+
+from shards import INDEX_FILENAME, INDEX_MAGIC, ShardReader, ShardWriter, shard_filename
+
+
+LONG_KEY = "a" * 150 + ".jpeg"
+UNICODE_KEY = "café0.png"
+
+
+def write_payloads(directory, payloads, max_shard_bytes=4096):
+    with ShardWriter(str(directory), max_shard_bytes) as writer:
+        for key, payload in payloads.items():
+            writer.add(key, payload)
+
+
+def test_roundtrip_by_key_and_position(tmp_path):
+    payloads = {f"image{index}.jpg": bytes([index]) * (700 + index) for index in range(12)}
+    payloads[LONG_KEY] = b"long"
+    payloads[UNICODE_KEY] = b"unicode"
+    write_payloads(tmp_path, payloads)
+
+    with ShardReader(str(tmp_path)) as reader:
+        assert len(reader) == len(payloads)
+        assert reader.keys() == sorted(payloads)
+        for key, payload in payloads.items():
+            assert key in reader
+            with reader.read(key) as view:
+                assert bytes(view) == payload
+        for position, key in enumerate(sorted(payloads)):
+            assert reader.entry(position).key == key
+            with reader.read(position) as view:
+                assert bytes(view) == payloads[key]
+        assert "missing.jpg" not in reader
+        with pytest.raises(KeyError):
+            reader.read("missing.jpg")
+        with pytest.raises(IndexError):
+            reader.entry(len(payloads))
+
+
+def test_shards_are_size_bounded_tar_archives(tmp_path):
+    payloads = {f"image{index}.jpg": os.urandom(1000 + index) for index in range(10)}
+    payloads[LONG_KEY] = b"long"
+    payloads[UNICODE_KEY] = b"unicode"
+    write_payloads(tmp_path, payloads)
+
+    shard_files = sorted(name for name in os.listdir(tmp_path) if name.endswith(".tar"))
+    assert len(shard_files) > 1
+
+    extracted = {}
+    for name in shard_files:
+        with tarfile.open(tmp_path / name) as archive:
+            for member in archive.getmembers():
+                extracted[member.name] = archive.extractfile(member).read()
+    assert extracted == payloads
+
+
+def test_reopen_appends_new_shards(tmp_path):
+    write_payloads(tmp_path, {"first.jpg": b"one", "shared.jpg": b"old"})
+    write_payloads(tmp_path, {"second.jpg": b"two", "shared.jpg": b"new"})
+
+    assert os.path.isfile(tmp_path / shard_filename(1))
+    with ShardReader(str(tmp_path)) as reader:
+        contents = {key: data for key, data in reader}
+        assert contents == {"first.jpg": b"one", "second.jpg": b"two", "shared.jpg": b"new"}
+        assert reader.entry(reader.keys().index("second.jpg")).shard == 1
+
+
+def test_iteration_inside_with_block_closes_cleanly(tmp_path):
+    write_payloads(tmp_path, {"image0.jpg": b"zero", "image1.jpg": b"one"})
+
+    with ShardReader(str(tmp_path)) as reader:
+        for key, data in reader:
+            assert isinstance(data, bytes)
+    assert data == b"one"
+
+
+def test_close_survives_exported_views(tmp_path):
+    write_payloads(tmp_path, {"image0.jpg": b"zero"})
+
+    reader = ShardReader(str(tmp_path))
+    view = reader.read("image0.jpg")
+    reader.close()
+    assert bytes(view) == b"zero"
+    view.release()
+
+
+def test_rejects_invalid_input(tmp_path):
+    with pytest.raises(ValueError):
+        ShardWriter(str(tmp_path), max_shard_bytes=0)
+
+    (tmp_path / INDEX_FILENAME).write_bytes(b"not an index 1234")
+    with pytest.raises(ValueError):
+        ShardReader(str(tmp_path))
+
+
+@pytest.mark.parametrize(
+    "index_bytes",
+    [b"GISID", INDEX_MAGIC + struct.pack("<Q", 5)],
+    ids=["truncated-header", "truncated-records"],
+)
+def test_rejects_truncated_index(tmp_path, index_bytes):
+    (tmp_path / INDEX_FILENAME).write_bytes(index_bytes)
+    with pytest.raises(ValueError):
+        ShardReader(str(tmp_path))
+
+
+def test_writer_rebuilds_corrupt_index(tmp_path):
+    write_payloads(tmp_path, {"first.jpg": b"one"})
+    (tmp_path / INDEX_FILENAME).write_bytes(b"GISID")
+    write_payloads(tmp_path, {"second.jpg": b"two"})
+
+    with ShardReader(str(tmp_path)) as reader:
+        assert {key: data for key, data in reader} == {"first.jpg": b"one", "second.jpg": b"two"}
+
+
+def test_writer_recovers_unclosed_shards(tmp_path):
+    write_payloads(tmp_path, {"shared.jpg": b"old"})
+    crashed = ShardWriter(str(tmp_path))
+    crashed.add("a.jpg", b"lost")
+    crashed.add("shared.jpg", b"newer")
+    crashed._shard_file.flush()
+
+    write_payloads(tmp_path, {"b.jpg": b"kept"})
+    crashed._shard_file.close()
+
+    with ShardReader(str(tmp_path)) as reader:
+        contents = {key: data for key, data in reader}
+    assert contents == {"a.jpg": b"lost", "b.jpg": b"kept", "shared.jpg": b"newer"}
+
+
+def test_concurrent_writers_use_distinct_shards(tmp_path):
+    first = ShardWriter(str(tmp_path))
+    second = ShardWriter(str(tmp_path))
+    first.add("first.jpg", b"one")
+    second.add("second.jpg", b"two")
+    first.close()
+    second.close()
+
+    assert sorted(name for name in os.listdir(tmp_path) if name.endswith(".tar")) == [
+        shard_filename(0),
+        shard_filename(1),
+    ]
+    with tarfile.open(tmp_path / shard_filename(0)) as archive:
+        assert archive.getnames() == ["first.jpg"]
+    with ShardReader(str(tmp_path)) as reader:
+        assert reader.keys() == ["first.jpg", "second.jpg"]
+
+
+def test_shard_size_includes_end_of_archive_marker(tmp_path):
+    max_shard_bytes = 4096
+    write_payloads(tmp_path, {f"image{index}.jpg": b"x" * 1500 for index in range(6)}, max_shard_bytes)
+
+    for name in os.listdir(tmp_path):
+        if name.endswith(".tar"):
+            assert os.path.getsize(tmp_path / name) <= max_shard_bytes